@@ -1,4 +1,5 @@
-from inspect import cleandoc, getdoc, Parameter, signature, isclass, isawaitable
+from inspect import cleandoc, getdoc, Parameter, signature, isclass, isawaitable, iscoroutinefunction
+from functools import partial
 from abc import ABC
 
 from .checks import Check, Cooldown
@@ -7,13 +8,20 @@ from .converters import Converter
 
 
 class BaseCommand(ABC):
+    __slots__ = ("commands", "_parent", "_checks", "_cooldown", "_keep_checks", "_name_index")
+
     def __init__(self, *commands, keep_checks=True):
+        self.commands = list(commands)
         self.parent = None  # Gets filled up by BaseCommand.add_command if this command is not the top level one
-        self._checks = []
+        self._checks = ()
         self._cooldown = None
-        self.commands = list(commands)
         self.keep_checks = keep_checks
 
+        # Maps every name and alias of the child commands to the command itself, so a path segment can be resolved
+        # with a single lookup instead of scanning all children
+        self._name_index = {}
+        self._rebuild_index()
+
     def set_cooldown(self, cooldown: Cooldown):
         self._cooldown = cooldown
 
@@ -22,7 +30,8 @@ class BaseCommand(ABC):
             await self._cooldown.reset()
 
     def add_check(self, check: Check):
-        self._checks.append(check)
+        self._checks += (check,)
+        self._invalidate()
 
     @property
     def checks(self):
@@ -32,16 +41,53 @@ class BaseCommand(ABC):
 
         yield from self._checks
 
+    @property
+    def keep_checks(self):
+        return self._keep_checks
+
+    @keep_checks.setter
+    def keep_checks(self, value):
+        self._keep_checks = value
+        self._invalidate()
+
+    @property
+    def parent(self):
+        return self._parent
+
+    @parent.setter
+    def parent(self, value):
+        self._parent = value
+        self._invalidate()
+
     @property
     def full_name(self):
         return ""
 
+    def _invalidate(self):
+        # Sub commands cache values that depend on their parents
+        for command in self.commands:
+            command._invalidate()
+
+    def _index_command(self, command):
+        # Only commands can be found by name, nested tables are not supported
+        if isinstance(command, Command):
+            # The first registered command keeps a name, same as the order the children were searched in before
+            for key in (command.name, *command.aliases):
+                self._name_index.setdefault(key, command)
+
+    def _rebuild_index(self):
+        self._name_index.clear()
+        for command in self.commands:
+            self._index_command(command)
+
     def add_command(self, command):
         command.parent = self
         self.commands.append(command)
+        self._index_command(command)
 
     def remove_command(self, command):
         self.commands.remove(command)
+        self._rebuild_index()
 
     def command(self, *args, **kwargs):
         def _predicate(callback):
@@ -60,28 +106,28 @@ class BaseCommand(ABC):
 
     def filter_commands(self, parts):
         if len(parts) == 0:
-            return []
+            return
 
-        for command in self.commands:
-            if isinstance(command, Command):
-                if command.name == parts[0] or parts[0] in command.aliases:
-                    yield command
+        command = self._name_index.get(parts[0])
+        if command is not None:
+            yield command
 
-            else:
-                yield command
+    def find_command(self, parts, offset=0):
+        # Walk down the name indexes for as long as the parts match a sub command, the remaining parts are only
+        # copied once for the command that was found
+        node = self
+        i = offset
+        while i < len(parts):
+            command = node._name_index.get(parts[i])
+            if command is None:
+                break
 
-    def find_command(self, parts):
-        for cmd in self.filter_commands(parts):
-            try:
-                parts, res = cmd.find_command(parts[1:])
-            except ValueError:
-                continue
+            node = command
+            i += 1
 
-            else:
-                return parts, res
-
-        if self.can_execute(parts):
-            return parts, self
+        parts = parts[i:]
+        if node.can_execute(parts):
+            return parts, node
 
         raise CommandNotFound()
 
@@ -93,6 +139,8 @@ class BaseCommand(ABC):
 
 
 class CommandTable(BaseCommand):
+    __slots__ = ()
+
     def can_execute(self, parts):
         return False
 
@@ -101,7 +149,48 @@ class CommandTable(BaseCommand):
             self.add_command(cmd)
 
 
+async def _noop_async(*args, **kwargs):
+    pass
+
+
+_TRUTHY = frozenset(("y", "yes", "true", "1"))
+
+
+def _bool_converter(a):
+    a = str(a).lower()
+    return a in _TRUTHY
+
+
+# Replacements for annotations that can't be used as a converter directly
+_CONVERTERS = {
+    bool: _bool_converter
+}
+
+
+def _split_kwargs(args):
+    result = {}
+    for token in args:
+        # Arguments without a "=" are ignored
+        key, sep, value = token.partition("=")
+        if sep:
+            result[key] = value
+
+    return result
+
+
+# How each kind of parameter takes its value from the parts and which converter is used if there is no annotation
+_PARSE_SOURCES = {
+    Parameter.POSITIONAL_ONLY: ("parts.pop(0)", False, str),
+    Parameter.POSITIONAL_OR_KEYWORD: ("parts.pop(0)", False, str),
+    Parameter.VAR_POSITIONAL: ("tuple(parts)", True, tuple),
+    Parameter.KEYWORD_ONLY: ("\" \".join(parts)", True, str),
+    Parameter.VAR_KEYWORD: ("_split_kwargs(parts)", True, dict),
+}
+
+
 class CommandParameter:
+    __slots__ = ("name", "kind", "default", "converter")
+
     def __init__(self, name, kind, default=Parameter.empty, converter=None):
         self.name = name
         self.kind = kind
@@ -113,13 +202,7 @@ class CommandParameter:
             elif self.kind == Parameter.VAR_POSITIONAL:
                 self.default = tuple()
 
-        self.converter = converter
-        if converter is bool:
-            def _bool_converter(a):
-                a = str(a).lower()
-                return a == "y" or a == "yes" or a == "true"
-
-            self.converter = _bool_converter
+        self.converter = _CONVERTERS.get(converter, converter)
 
     @classmethod
     def from_parameter(cls, p):
@@ -149,10 +232,7 @@ class CommandParameter:
 
         elif self.kind == Parameter.VAR_KEYWORD:
             converter = self.converter or dict
-            arg = {
-                a: b
-                for a, b in map(lambda ab: ab.split("="), args)
-            }
+            arg = _split_kwargs(args)
             args.clear()
 
         else:
@@ -170,6 +250,9 @@ class CommandParameter:
 
 
 class Command(BaseCommand):
+    __slots__ = ("module", "callback", "_name", "description", "_aliases", "hidden", "parameters", "_parse",
+                 "_invoke", "_is_coro", "_brief", "_usage_suffix", "_full_name", "_run_checks")
+
     def __init__(self, callback, name=None, description=None, aliases=None, hidden=False, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -186,21 +269,144 @@ class Command(BaseCommand):
             cb = cb.next
 
         self.callback = cb
-        self.name = name or self.callback.__name__
+        self._is_coro = iscoroutinefunction(cb)
+        self._name = name or self.callback.__name__
         doc = getdoc(self.callback)
         self.description = description or cleandoc(doc) if doc else ""
-        self.aliases = aliases or []
+        self._aliases = tuple(aliases or ())
         self.hidden = hidden
 
         sig = signature(self.callback)
-        self.parameters = [
+        self.parameters = tuple(
             CommandParameter.from_parameter(p)
-            for _, p in list(sig.parameters.items())
+            for p in sig.parameters.values()
             if p.name != "self" and p.name != "ctx"  # Skip self and ctx
-        ]
+        )
+        self._parse = self._compile_parse()
+
+        # Gets replaced by fill_module to prepend the module to the arguments
+        self._invoke = self.callback
+
+        # Neither the description nor the parameters change after this point
+        self._brief = self._make_brief()
+        self._usage_suffix = self._make_usage_suffix()
+
+    @property
+    def name(self):
+        return self._name
+
+    @name.setter
+    def name(self, value):
+        self._name = value
+        self._invalidate()
+        if self.parent is not None:
+            self.parent._rebuild_index()
+
+    @property
+    def aliases(self):
+        return self._aliases
+
+    @aliases.setter
+    def aliases(self, value):
+        self._aliases = tuple(value)
+        if self.parent is not None:
+            self.parent._rebuild_index()
+
+    def _invalidate(self):
+        self._full_name = None
+        self._run_checks = None
+        super()._invalidate()
+
+    def _build_run_checks(self):
+        checks = tuple(self.checks)
+        if len(checks) == 0:
+            return _noop_async
+
+        async def _run_checks(ctx, *args, **kwargs):
+            for check in checks:
+                await check.run(ctx, *args, **kwargs)
+
+        return _run_checks
 
     @property
     def brief(self):
+        return self._brief
+
+    @property
+    def full_name(self):
+        if self._full_name is None:
+            if self.parent is None:
+                self._full_name = self.name
+
+            else:
+                self._full_name = (self.parent.full_name + " " + self.name).strip()
+
+        return self._full_name
+
+    @property
+    def usage(self):
+        return self.full_name + self._usage_suffix
+
+    def _compile_parse(self):
+        """
+        Generate a function that parses the parts into (args, kwargs) for exactly the parameters of this command
+
+        This does the same as calling CommandParameter.parse for every parameter, but the kind, default and converter
+        checks are resolved once here instead of on every invocation.
+        """
+        namespace = {
+            "_split_kwargs": _split_kwargs,
+            "ConverterFailed": ConverterFailed,
+            "NotEnoughArguments": NotEnoughArguments
+        }
+        lines = ["def _parse(parts):"]
+        positional = []
+        keyword = []
+        for i, param in enumerate(self.parameters):
+            take, consumes_all, default_converter = _PARSE_SOURCES[param.kind]
+            converter = param.converter or default_converter
+            namespace["p%d" % i] = param
+            namespace["c%d" % i] = converter
+            namespace["d%d" % i] = param.default
+
+            lines.append("    if parts:")
+            lines.append("        arg = %s" % take)
+            if consumes_all:
+                lines.append("        parts.clear()")
+
+            if isclass(converter) and issubclass(converter, Converter):
+                lines.append("        a%d = c%d(p%d, arg)" % (i, i, i))
+
+            else:
+                lines.append("        try:")
+                lines.append("            a%d = c%d(arg)" % (i, i))
+                lines.append("        except Exception as e:")
+                lines.append("            raise ConverterFailed(p%d, arg, str(e))" % i)
+
+            lines.append("    else:")
+            if param.default != Parameter.empty:
+                lines.append("        a%d = d%d" % (i, i))
+
+            else:
+                lines.append("        raise NotEnoughArguments(p%d)" % i)
+
+            if param.kind == Parameter.VAR_POSITIONAL:
+                positional.append("*a%d" % i)
+
+            elif param.kind == Parameter.KEYWORD_ONLY:
+                keyword.append("%r: a%d" % (param.name, i))
+
+            elif param.kind == Parameter.VAR_KEYWORD:
+                keyword.append("**a%d" % i)
+
+            else:
+                positional.append("a%d" % i)
+
+        lines.append("    return [%s], {%s}" % (", ".join(positional), ", ".join(keyword)))
+        exec(compile("\n".join(lines) + "\n", "<command %s>" % self.name, "exec"), namespace)
+        return namespace["_parse"]
+
+    def _make_brief(self):
         lines = self.description.splitlines()
         if len(lines) == 0:
             return ""
@@ -211,16 +417,7 @@ class Command(BaseCommand):
 
         return line
 
-    @property
-    def full_name(self):
-        if self.parent is None:
-            return self.name
-
-        else:
-            return (self.parent.full_name + " " + self.name).strip()
-
-    @property
-    def usage(self):
+    def _make_usage_suffix(self):
         result = ""
         for param in self.parameters:
             name = param.name
@@ -243,10 +440,11 @@ class Command(BaseCommand):
             else:
                 result += " <%s>" % name
 
-        return self.full_name + result
+        return result
 
     def fill_module(self, module):
         self.module = module
+        self._invoke = partial(self.callback, module)
         for cmd in self.commands:
             cmd.fill_module(module)
 
@@ -255,35 +453,23 @@ class Command(BaseCommand):
 
     async def execute(self, ctx, parts):
         ctx.last_cmd = self
-        default = []
-        args = []
-        kwargs = {}
-
-        for parameter in self.parameters:
-            if parameter.kind == Parameter.VAR_POSITIONAL:
-                args.extend(parameter.parse(parts))
+        args, kwargs = self._parse(parts)
 
-            elif parameter.kind == Parameter.VAR_KEYWORD:
-                kwargs.update(parameter.parse(parts))
+        # The checks of this command and its parents are collected into a single coroutine function on first use
+        run_checks = self._run_checks
+        if run_checks is None:
+            run_checks = self._run_checks = self._build_run_checks()
 
-            elif parameter.kind == Parameter.KEYWORD_ONLY:
-                kwargs[parameter.name] = parameter.parse(parts)
-
-            else:
-                default.append(parameter.parse(parts))
-
-        for check in self.checks:
-            await check.run(ctx, *default, *args, **kwargs)
+        await run_checks(ctx, *args, **kwargs)
 
         if self._cooldown is not None:
-            await self._cooldown.run(ctx, *default, *args, **kwargs)
-
-        if self.module is None:
-            res = self.callback(ctx, *default, *args, **kwargs)
+            await self._cooldown.run(ctx, *args, **kwargs)
 
-        else:
-            res = self.callback(self.module, ctx, *default, *args, **kwargs)
+        res = self._invoke(ctx, *args, **kwargs)
+        if self._is_coro:
+            return await res
 
+        # Plain functions might still return an awaitable
         if isawaitable(res):
             return await res
 
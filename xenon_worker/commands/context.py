@@ -20,6 +20,19 @@ class Context:
     def f(self):
         return self.client.f
 
+    # The message attributes used by almost every check, these would otherwise go through __getattr__
+    @property
+    def author(self):
+        return self.msg.author
+
+    @property
+    def channel_id(self):
+        return self.msg.channel_id
+
+    @property
+    def guild_id(self):
+        return self.msg.guild_id
+
     async def get_channel(self):
         return await self.client.get_channel(self.msg.channel_id)
 
@@ -16,6 +16,18 @@ class Format:
     icon: str = None
     extra: str = ""
 
+    def __post_init__(self):
+        # The shape of the embed is the same for every message, only the description changes
+        # The author dict is shared between all messages formatted with this format and must not be modified
+        self._template = {
+            "color": self.color,
+            "description": "",
+            "author": {
+                "name": self.title,
+                "icon_url": self.icon
+            }
+        }
+
     def __call__(self, *args, **kwargs):
         # This makes it possible to use an existing format object with a raise statement to directly yield make
         # to the command error handler(s) and let them format the message
@@ -57,14 +69,8 @@ class Formatter:
     )
 
     def format(self, content="", *, embed=None, f: Format = DEFAULT, **kwargs):
-        formatted = {
-            "color": f.color,
-            "description": content + f.extra,
-            "author": {
-                "name": f.title,
-                "icon_url": f.icon
-            }
-        }
+        formatted = f._template.copy()
+        formatted["description"] = content + f.extra
 
         if embed is not None:
             formatted.update(embed)
@@ -7,59 +7,115 @@ from .permissions import Permissions, PermissionOverwrite
 DISCORD_EPOCH = 1420070400000
 DISCORD_CDN = "https://cdn.discordapp.com"
 
+_split_time = re.compile(r'[^\d]').split
+
+# Looking up the members directly is a lot cheaper than calling the enum
+_CHANNEL_TYPES = ChannelType._value2member_map_
+_VERIFICATION_LEVELS = VerificationLevel._value2member_map_
+_DEFAULT_MESSAGE_NOTIFICATIONS = DefaultMessageNotifications._value2member_map_
+_EXPLICIT_CONTENT_FILTERS = ExplicitContentFilter._value2member_map_
+_MFA_LEVELS = MFALevel._value2member_map_
+_MESSAGE_TYPES = MessageType._value2member_map_
+_WEBHOOK_TYPES = WebhookType._value2member_map_
+
 
 def parse_time(timestamp):
     if timestamp:
-        return datetime(*map(int, re.split(r'[^\d]', timestamp.replace('+00:00', ''))))
+        try:
+            # Discord timestamps are always UTC, keep returning naive datetimes
+            return datetime.fromisoformat(timestamp).replace(tzinfo=None)
+        except ValueError:
+            # Fraction digits that fromisoformat doesn't accept on older python versions, the fraction is padded to
+            # microseconds so the result is the same as with fromisoformat
+            whole, _, fraction = timestamp.replace('+00:00', '').partition('.')
+            parts = list(map(int, _split_time(whole)))
+            if fraction:
+                parts.append(int(fraction[:6].ljust(6, '0')))
+
+            return datetime(*parts)
 
     return None
 
 
 class Snowflake:
-    __slots__ = ("id",)
+    __slots__ = ("id", "_int_id", "_hash")
 
     def __init__(self, id):
         self.id = id
+        self._cache_id()
+
+    def _cache_id(self):
+        # Discord sends ids as strings, parse them once instead of on every hash or comparison
+        self._int_id = int(self.id) if self.id is not None else None
+        self._hash = self._int_id >> 22 if self._int_id is not None else 0
 
     def __hash__(self):
-        return int(self.id) >> 22
+        return self._hash
 
     def __eq__(self, other):
-        return isinstance(other, self.__class__) and other.id == self.id
+        return isinstance(other, self.__class__) and other._int_id == self._int_id
 
     def __ne__(self, other):
         if isinstance(other, self.__class__):
-            return other.id != self.id
+            return other._int_id != self._int_id
 
         return True
 
     @property
     def created_at(self):
-        return datetime.utcfromtimestamp(((int(self.id) >> 22) + DISCORD_EPOCH) / 1000)
+        return datetime.utcfromtimestamp(((self._int_id >> 22) + DISCORD_EPOCH) / 1000)
 
 
 class Entity(Snowflake):
     __slots__ = ("_data",)
+    _fields = ("id",)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Collect the public slots of the whole class hierarchy once, they get filled directly from the data
+        fields = []
+        for klass in reversed(cls.__mro__):
+            slots = klass.__dict__.get("__slots__", ())
+            if isinstance(slots, str):
+                slots = (slots,)
+
+            fields.extend(s for s in slots if not s.startswith("_") and s not in fields)
+
+        cls._fields = tuple(fields)
 
     def __init__(self, data: dict):
-        self._preprocess(data)
         self._data = data
+        for key in self._fields:
+            setattr(self, key, data.get(key))
+
+        self._preprocess(data)
+        self._cache_id()
 
     def _preprocess(self, data):
         pass
 
-    def __getattr__(self, item):
-        return self._data.get(item)
+    def get(self, key, default=None):
+        """
+        Access fields that aren't known (yet) and therefore don't have a slot
+        """
+        return self._data.get(key, default)
 
     def update(self, data: dict):
-        self._preprocess(data)
         self._data.update(data)
+        for key in self._fields:
+            if key in data:
+                setattr(self, key, data[key])
+
+        self._preprocess(data)
+        self._cache_id()
 
     def to_dict(self):
         return self._data
 
 
 class Role(Entity):
+    __slots__ = ("guild_id", "name", "color", "hoist", "position", "permissions", "managed", "mentionable", "tags")
+
     def _preprocess(self, data):
         self.permissions = Permissions(int(data["permissions"]))
 
@@ -73,7 +129,7 @@ class Channel(Entity):
                  "parent_id", "last_pin_timestamp")
 
     def _preprocess(self, data):
-        self.type = ChannelType(data["type"])
+        self.type = _CHANNEL_TYPES[data["type"]]
         self.permission_overwrites = [
             (
                 overwrite["id"],
@@ -118,27 +174,43 @@ class User(Entity):
 
     @property
     def mention(self):
-        return "<@{0.id}>".format(self)
+        return f"<@{self.id}>"
 
     def __str__(self):
-        return "{0.name}#{0.discriminator}".format(self)
+        return f"{self.name}#{self.discriminator}"
 
 
 class Member(User):
-    __slots__ = ("user", "nick", "deaf", "mute", "roles", "joined_at", "premium_since")
+    __slots__ = ("_user", "nick", "deaf", "mute", "roles", "joined_at", "premium_since")
 
     def _preprocess(self, data):
-        self.user = User(data["user"])
+        self._user = None  # Gets created by Member.user on first access
+        user = data.get("user")
+        if user is not None:
+            # Copy the user fields onto the member itself, member fields are only used if the user doesn't have them
+            for key in User._fields:
+                value = user.get(key)
+                if value is not None:
+                    setattr(self, key, value)
+
         self.joined_at = parse_time(data.get("joined_at"))
         self.premium_since = parse_time(data.get("premium_since"))
         self.roles = data.get("roles", [])
 
-    def __getattr__(self, item):
-        user_attr = getattr(self.user, item)
-        if user_attr is not None:
-            return user_attr
+    @property
+    def user(self):
+        if self._user is None:
+            self._user = User(self._data["user"])
+
+        return self._user
+
+    def get(self, key, default=None):
+        # Same order as the slots, the user value takes precedence over the member value
+        value = self._data.get("user", {}).get(key)
+        if value is not None:
+            return value
 
-        return self._data.get(item)
+        return self._data.get(key, default)
 
     def roles_from_guild(self, guild):
         for role in guild.roles:
@@ -190,22 +262,36 @@ class Guild(Entity):
                  "mfa_level", "application_id", "widget_enabled", "widget_channel_id", "system_channel_id",
                  "joined_at", "large", "unavailable", "member_count", "voice_states", "members", "channels",
                  "presences", "max_presences", "max_members", "vanity_url_code", "description", "banner",
-                 "premium_tier", "premium_subscription_count", "preferred_locale")
+                 "premium_tier", "premium_subscription_count", "preferred_locale", "_icon_url_cache")
 
     def _preprocess(self, data):
+        # Also runs on update, which might change the icon
+        self._icon_url_cache = None  # Gets created by icon_url_as on first use
+        if data.get("unavailable"):
+            # Unavailable guilds (outages) only consist of the id
+            self.roles = []
+            self.members = []
+            self.channels = []
+            return
+
         self.permissions = Permissions(int(data["permissions"])) if data.get("permissions") is not None else None
-        self.verification_level = VerificationLevel(data["verification_level"])
-        self.default_message_notifications = DefaultMessageNotifications(data["default_message_notifications"])
-        self.explicit_content_filter = ExplicitContentFilter(data["explicit_content_filter"])
-        self.mfa_level = MFALevel(data["mfa_level"])
-        self.roles = []
+        self.verification_level = _VERIFICATION_LEVELS[data["verification_level"]]
+        self.default_message_notifications = _DEFAULT_MESSAGE_NOTIFICATIONS[data["default_message_notifications"]]
+        self.explicit_content_filter = _EXPLICIT_CONTENT_FILTERS[data["explicit_content_filter"]]
+        self.mfa_level = _MFA_LEVELS[data["mfa_level"]]
+
+        # Large guilds contain thousands of members, avoid the global lookups for every single one of them
+        _Role, _Member, _Channel = Role, Member, Channel
+        guild_id = self.id
+        self.roles = roles = []
+        append_role = roles.append
         for role in data.get("roles", []):
-            role["guild_id"] = data["id"]
-            self.roles.append(Role(role))
+            role["guild_id"] = guild_id
+            append_role(_Role(role))
 
         # self.emojis =
-        self.members = [Member(d) for d in data.get("members", [])]
-        self.channels = [Channel(d) for d in data.get("channels", [])]
+        self.members = list(map(_Member, data.get("members", [])))
+        self.channels = list(map(_Channel, data.get("channels", [])))
 
     @property
     def icon_animated(self):
@@ -216,17 +302,29 @@ class Guild(Entity):
         return self.icon_url_as()
 
     def icon_url_as(self, *, format=None, static_format='webp', size=1024):
+        key = (format, static_format, size)
+        cache = self._icon_url_cache
+        if cache is None:
+            cache = self._icon_url_cache = {}
+
+        elif key in cache:
+            return cache[key]
+
         if self.icon is None:
-            return None
+            url = None
+
+        else:
+            if format is None:
+                if self.icon_animated:
+                    format = "gif"
 
-        if format is None:
-            if self.icon_animated:
-                format = "gif"
+                else:
+                    format = static_format
 
-            else:
-                format = static_format
+            url = f"{DISCORD_CDN}/icons/{self.id}/{self.icon}.{format}?size={size}"
 
-        return DISCORD_CDN + "/icons/{0.id}/{0.icon}.{1}?size={2}".format(self, format, size)
+        cache[key] = url
+        return url
 
     @property
     def splash_url(self):
@@ -243,11 +341,13 @@ class Guild(Entity):
 
 
 class Message(Entity):
+    __slots__ = ("type", "channel_id", "guild_id", "author", "content", "timestamp", "edited_timestamp", "tts",
+                 "mention_everyone", "mentions", "mention_roles", "mention_channels", "attachments", "embeds",
+                 "reactions", "nonce", "pinned", "webhook_id", "activity", "application", "message_reference",
+                 "flags", "referenced_message")
+
     def _preprocess(self, data):
-        try:
-            self.type = MessageType(data["type"])
-        except ValueError:
-            self.type = MessageType(0)
+        self.type = _MESSAGE_TYPES.get(data["type"], MessageType.DEFAULT)
 
         self.timestamp = parse_time(data["timestamp"])
         # self.mentions
@@ -263,6 +363,8 @@ class Message(Entity):
 
 
 class Webhook(Entity):
+    __slots__ = ("type", "guild_id", "channel_id", "user", "name", "avatar", "token", "application_id")
+
     def _preprocess(self, data):
-        self.user = User(data.get("user"))
-        self.type = WebhookType(data["type"])
+        self.user = User(data["user"]) if data.get("user") is not None else None
+        self.type = _WEBHOOK_TYPES[data["type"]]